@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark for the Vyānamana backend.
+
+Measures, in a fresh interpreter per run, how long it takes to import
+``main``, build the app with ``create_app`` and serve the first request.
+The first request goes straight through the ASGI interface, so no server
+or MongoDB instance is needed as long as the path does not touch the
+database.
+
+Usage (from the backend directory):
+    python benchmarks/startup.py --runs 10 --path /openapi.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import asyncio, json, sys, time
+
+path = sys.argv[1]
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+app = main.create_app()
+t2 = time.perf_counter()
+
+async def first_request():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 12345), "server": ("localhost", 8000),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+status = asyncio.run(first_request())
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1, "first_request": t3 - t2, "status": status}))
+"""
+
+
+def run_once(path: str) -> dict:
+    """Run the probe in a fresh interpreter and return its timings."""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, path],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the benchmark and print a summary in milliseconds."""
+    parser = argparse.ArgumentParser(description="Measure backend cold start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/openapi.json")
+    args = parser.parse_args()
+
+    results = [run_once(args.path) for _ in range(args.runs)]
+    print(f"{args.runs} runs, first request GET {args.path} -> {results[-1]['status']}")
+    for phase in ("import", "create_app", "first_request"):
+        samples = [r[phase] * 1000 for r in results]
+        print(f"{phase:>14}: median {statistics.median(samples):8.1f} ms  min {min(samples):8.1f} ms")
+    totals = [sum(r[p] for p in ("import", "create_app", "first_request")) * 1000 for r in results]
+    print(f"{'total':>14}: median {statistics.median(totals):8.1f} ms  min {min(totals):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Environment configuration for the Vyānamana backend.
+"""
+import os
+
+# Security
+SECRET_KEY = os.environ.get("SECRET_KEY", "vyanamanasecretkey")
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
+
+# Database connection
+MONGODB_URL = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
+
+# OpenAI API configuration
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+
+# Rate limiting and load shedding
+RATE_LIMIT_BACKENDS = {"local", "redis"}
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "local")
+if RATE_LIMIT_BACKEND not in RATE_LIMIT_BACKENDS:
+    raise ValueError(
+        f"RATE_LIMIT_BACKEND must be one of {sorted(RATE_LIMIT_BACKENDS)}, got {RATE_LIMIT_BACKEND!r}"
+    )
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+LOAD_SHED_MAX_LOOP_LAG_MS = float(os.environ.get("LOAD_SHED_MAX_LOOP_LAG_MS", "200"))
+LOAD_SHED_MAX_POOL_WAIT_MS = float(os.environ.get("LOAD_SHED_MAX_POOL_WAIT_MS", "100"))
+
+# Production server
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", str(min(os.cpu_count() or 1, 8))))
@@ -0,0 +1,37 @@
+"""
+MongoDB connection for the Vyānamana backend.
+"""
+from functools import lru_cache
+
+from config import MONGODB_URL
+from middleware.rate_limit import PoolWaitMonitor
+
+pool_monitor = PoolWaitMonitor()
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Create the Motor client on first use rather than at import time.
+
+    Only call this from the event loop thread: ``lru_cache`` does not lock,
+    so concurrent first calls from worker threads could build several
+    clients.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(MONGODB_URL, event_listeners=[pool_monitor])
+
+
+async def get_db():
+    """Get the application database.
+
+    This is ``async`` so that FastAPI runs it on the event loop instead of
+    the threadpool, which keeps client creation single-threaded.
+    """
+    return get_client().vyanamana_db
+
+
+def close_client():
+    """Close the Motor client if it was ever created."""
+    if get_client.cache_info().currsize:
+        get_client().close()
+        get_client.cache_clear()
@@ -0,0 +1,361 @@
+"""
+Rate limiting and load shedding middleware for the Vyānamana backend.
+"""
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RateLimitRule:
+    """Token-bucket budget for requests matching a method and path template."""
+    method: str
+    path: str  # Route template, e.g. "/chats/{chat_id}/messages"
+    capacity: int  # Maximum burst size
+    refill_rate: float  # Tokens added per second
+
+    def __post_init__(self):
+        pattern = re.sub(r"\{[^/}]+\}", "[^/]+", self.path)
+        self._regex = re.compile(f"^{pattern}$")
+
+    def matches(self, method: str, path: str) -> bool:
+        """Check whether a request falls under this rule."""
+        return method == self.method and self._regex.match(path) is not None
+
+
+class LocalBucketStore:
+    """In-process token bucket store, used for single workers and tests.
+
+    Buckets idle for longer than it takes them to refill completely are
+    equivalent to new ones, so they are dropped on a periodic sweep.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sweep_interval: float = 60.0):
+        self._clock = clock
+        self._sweep_interval = sweep_interval
+        self._next_sweep: Optional[float] = None
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, cost: int = 1) -> Tuple[bool, float]:
+        """Take tokens from a bucket; return (allowed, seconds until retry)."""
+        now = self._clock()
+        self._maybe_sweep(now)
+        idle_ttl = capacity / refill_rate
+        tokens, updated, _ = self._buckets.get(key, (float(capacity), now, idle_ttl))
+        tokens = min(float(capacity), tokens + (now - updated) * refill_rate)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now, idle_ttl)
+            return True, 0.0
+        self._buckets[key] = (tokens, now, idle_ttl)
+        return False, (cost - tokens) / refill_rate
+
+    async def close(self):
+        """Nothing to release; present for parity with ``RedisBucketStore``."""
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _maybe_sweep(self, now: float):
+        if self._next_sweep is None:
+            self._next_sweep = now + self._sweep_interval
+            return
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._sweep_interval
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket[1] <= bucket[2]
+        }
+
+
+class RedisBucketStore:
+    """Token bucket store shared between workers through Redis.
+
+    While Redis is unreachable, buckets are kept in a per-process
+    ``LocalBucketStore`` so that limited routes keep working. Use
+    ``from_url`` to connect; the constructor takes an existing client.
+    """
+
+    # Refill and take in one atomic step, using the Redis clock so that
+    # workers on different hosts agree on elapsed time.
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(
+        self,
+        redis,
+        errors=(),
+        prefix: str = "vyanamana:ratelimit:",
+        cooldown: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._redis = redis
+        self._script = redis.register_script(self.SCRIPT)
+        self._errors = errors
+        self._prefix = prefix
+        self._cooldown = cooldown
+        self._clock = clock
+        self._fallback = LocalBucketStore(clock=clock)
+        self._failing = False
+        self._retry_at: Optional[float] = None
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 0.25, **kwargs) -> "RedisBucketStore":
+        """Connect to Redis at ``url``; requires the redis package."""
+        try:
+            from redis import asyncio as aioredis
+            from redis.exceptions import RedisError
+        except ImportError as exc:
+            raise RuntimeError("The redis package is required for RATE_LIMIT_BACKEND=redis") from exc
+        redis = aioredis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        return cls(redis, errors=RedisError, **kwargs)
+
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
+
+    async def consume(self, key: str, capacity: int, refill_rate: float, cost: int = 1) -> Tuple[bool, float]:
+        """Take tokens from a bucket; return (allowed, seconds until retry).
+
+        After a Redis error, requests use the local buckets without touching
+        Redis for ``cooldown`` seconds. Then a single request probes Redis
+        again while the others keep using the fallback.
+        """
+        now = self._clock()
+        if self._retry_at is not None and now < self._retry_at:
+            return await self._fallback.consume(key, capacity, refill_rate, cost)
+        if self._failing:
+            self._retry_at = now + self._cooldown
+        try:
+            allowed, tokens = await self._script(
+                keys=[self._prefix + key], args=[capacity, refill_rate, cost]
+            )
+        except self._errors as exc:
+            self._retry_at = self._clock() + self._cooldown
+            if not self._failing:
+                self._failing = True
+                logger.warning("Redis rate limit backend unavailable, using per-process buckets: %s", exc)
+            return await self._fallback.consume(key, capacity, refill_rate, cost)
+        self._retry_at = None
+        if self._failing:
+            self._failing = False
+            logger.warning("Redis rate limit backend recovered")
+        if int(allowed):
+            return True, 0.0
+        return False, (cost - float(tokens)) / refill_rate
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up from a periodic sleep."""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running loop if not already started."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the sampling task and wait for it to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.lag = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - started - self.interval)
+
+
+class PoolWaitMonitor(monitoring.ConnectionPoolListener):
+    """Track how long Mongo operations wait to check out a pooled connection.
+
+    Register with ``AsyncIOMotorClient(..., event_listeners=[monitor])``.
+    Motor runs pymongo on executor threads, so check-out start and finish
+    for one operation are seen on the same thread. Check-outs that had to
+    open a new connection are not sampled: their time is dominated by the
+    TCP, TLS and auth handshake rather than by waiting for the pool.
+    Executor threads update the shared average under a lock.
+    """
+
+    def __init__(self, smoothing: float = 0.2, stale_after: float = 5.0):
+        self.smoothing = smoothing
+        self.stale_after = stale_after
+        self._average = 0.0
+        self._last_sample = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def wait(self) -> float:
+        """Smoothed check-out wait in seconds, or 0 if there is no recent traffic."""
+        if time.monotonic() - self._last_sample > self.stale_after:
+            return 0.0
+        return self._average
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.monotonic()
+        self._local.created = False
+
+    def connection_checked_out(self, event):
+        self._record()
+
+    def connection_check_out_failed(self, event):
+        self._record()
+
+    def _record(self):
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return
+        self._local.started = None
+        if self._local.created:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._average += self.smoothing * ((now - started) - self._average)
+            self._last_sample = now
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._local.created = True
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def client_ip_key(request: Request) -> str:
+    """Default rate limit key: the client IP address."""
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying per-route token buckets and load shedding.
+
+    Requests matching a rule are rejected with 503 while the event loop lag
+    or Mongo pool wait is above its threshold, and with 429 once the
+    caller's bucket for that route is empty. Other requests pass through.
+    The lag monitor is started and stopped by the application lifespan.
+    """
+
+    def __init__(
+        self,
+        app,
+        rules: List[RateLimitRule],
+        store=None,
+        key_func: Callable[[Request], str] = client_ip_key,
+        lag_monitor: Optional[EventLoopLagMonitor] = None,
+        pool_monitor: Optional[PoolWaitMonitor] = None,
+        max_loop_lag: Optional[float] = None,
+        max_pool_wait: Optional[float] = None,
+    ):
+        self.app = app
+        self.rules = rules
+        self.store = store or LocalBucketStore()
+        self.key_func = key_func
+        self.lag_monitor = lag_monitor
+        self.pool_monitor = pool_monitor
+        self.max_loop_lag = max_loop_lag
+        self.max_pool_wait = max_pool_wait
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self._overloaded():
+            response = JSONResponse(
+                {"detail": "Server is overloaded, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        request = Request(scope)
+        key = f"{rule.method}:{rule.path}:{self.key_func(request)}"
+        allowed, retry_after = await self.store.consume(key, rule.capacity, rule.refill_rate)
+        if not allowed:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    def _overloaded(self) -> bool:
+        if self.lag_monitor is not None and self.max_loop_lag is not None:
+            if self.lag_monitor.lag > self.max_loop_lag:
+                return True
+        if self.pool_monitor is not None and self.max_pool_wait is not None:
+            if self.pool_monitor.wait > self.max_pool_wait:
+                return True
+        return False
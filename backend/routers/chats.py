@@ -0,0 +1,151 @@
+"""
+Chat routes for the Vyānamana API.
+"""
+import random
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends
+
+from database import get_db
+from models.user import User
+from models.chat import Message, ChatSession, ChatResponse, MessageCreate
+from security import get_current_user
+
+router = APIRouter(prefix="/chats", tags=["chats"])
+
+
+@router.post("", response_model=ChatResponse)
+async def create_chat(current_user: User = Depends(get_current_user), db=Depends(get_db)):
+    """Create a new chat session."""
+    chat = ChatSession(
+        user_id=current_user.id,
+        name="New conversation",  # Default name, will be updated with first message
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    
+    result = await db.chats.insert_one(chat.dict(by_alias=True))
+    created_chat = await db.chats.find_one({"_id": result.inserted_id})
+    
+    # Return chat with empty messages list
+    return ChatResponse(**created_chat, messages=[])
+
+@router.get("", response_model=List[ChatResponse])
+async def get_chats(current_user: User = Depends(get_current_user), db=Depends(get_db)):
+    """Get all chat sessions for the current user."""
+    chats = []
+    cursor = db.chats.find({"user_id": current_user.id})
+    
+    async for chat in cursor:
+        # Get messages for this chat
+        messages = []
+        message_cursor = db.messages.find({"chat_id": chat["_id"]}).sort("timestamp", 1)
+        async for message in message_cursor:
+            messages.append(Message(**message))
+        
+        chats.append(ChatResponse(**chat, messages=messages))
+    
+    return chats
+
+@router.get("/{chat_id}", response_model=ChatResponse)
+async def get_chat(
+    chat_id: str,
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Get a specific chat session with messages."""
+    chat = await db.chats.find_one({"_id": ObjectId(chat_id), "user_id": current_user.id})
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    
+    # Get messages for this chat
+    messages = []
+    cursor = db.messages.find({"chat_id": ObjectId(chat_id)}).sort("timestamp", 1)
+    async for message in cursor:
+        messages.append(Message(**message))
+    
+    return ChatResponse(**chat, messages=messages)
+
+@router.post("/{chat_id}/messages", response_model=Message)
+async def send_message(
+    chat_id: str, 
+    message_create: MessageCreate, 
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Send a new message in a chat and get AI response."""
+    # Verify chat exists and belongs to user
+    chat = await db.chats.find_one({"_id": ObjectId(chat_id), "user_id": current_user.id})
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    
+    # Save user message
+    user_message = Message(
+        chat_id=ObjectId(chat_id),
+        content=message_create.content,
+        sender="user",
+        timestamp=datetime.utcnow()
+    )
+    
+    await db.messages.insert_one(user_message.dict(by_alias=True))
+    
+    # If this is the first message, update chat name
+    if chat["name"] == "New conversation":
+        # Generate a name based on the first message
+        name_preview = message_create.content[:30] + "..." if len(message_create.content) > 30 else message_create.content
+        await db.chats.update_one(
+            {"_id": ObjectId(chat_id)},
+            {"$set": {"name": name_preview, "updated_at": datetime.utcnow()}}
+        )
+    
+    # Perform sentiment analysis
+    # In a real app, you would use a proper sentiment analysis model
+    # For now, we'll use a simple mock implementation
+    sentiment = {
+        "score": 0.0,  # Neutral by default
+        "label": "neutral"
+    }
+    
+    # Update user message with sentiment
+    await db.messages.update_one(
+        {"_id": user_message.id},
+        {"$set": {"sentiment": sentiment}}
+    )
+    
+    # In a real implementation, we would call OpenAI's API here
+    # For now, we'll use a simple mock response
+    bot_responses = [
+        "I understand how you're feeling. Would you like to talk more about that?",
+        "Thank you for sharing that with me. How long have you been feeling this way?",
+        "That sounds challenging. What helps you cope when you feel like this?",
+        "I'm here to listen. Would you like to explore some techniques that might help?",
+        "Your feelings are valid. It takes courage to express them.",
+        "I hear you. Sometimes just talking about our feelings can help us process them better.",
+        "Would you like to try a quick mindfulness exercise to help center yourself?",
+        "It sounds like you're going through a lot. Remember to be kind to yourself during this time.",
+        "Have you spoken to anyone else about how you're feeling?",
+        "I'm glad you reached out today. Is there anything specific you'd like support with?",
+    ]
+    bot_response = random.choice(bot_responses)
+    
+    # Create and save bot response
+    bot_message = Message(
+        chat_id=ObjectId(chat_id),
+        content=bot_response,
+        sender="bot",
+        timestamp=datetime.utcnow()
+    )
+    
+    await db.messages.insert_one(bot_message.dict(by_alias=True))
+    
+    # Update chat last update time
+    await db.chats.update_one(
+        {"_id": ObjectId(chat_id)},
+        {"$set": {"updated_at": datetime.utcnow()}}
+    )
+    
+    # Fetch complete bot message with ID for response
+    bot_message_db = await db.messages.find_one({"_id": bot_message.id})
+    
+    return Message(**bot_message_db)
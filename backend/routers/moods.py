@@ -0,0 +1,73 @@
+"""
+Mood tracking routes for the Vyānamana API.
+"""
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends
+
+from database import get_db
+from models.user import User
+from models.mood import MoodEntry, MoodEntryCreate, MoodEntryResponse
+from security import get_current_user
+
+router = APIRouter(prefix="/moods", tags=["moods"])
+
+
+@router.post("", response_model=MoodEntryResponse)
+async def create_mood_entry(
+    mood_create: MoodEntryCreate, 
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Create a new mood entry."""
+    mood_entry = MoodEntry(
+        user_id=current_user.id,
+        mood=mood_create.mood,
+        note=mood_create.note,
+        timestamp=datetime.utcnow()
+    )
+    
+    result = await db.moods.insert_one(mood_entry.dict(by_alias=True))
+    created_mood = await db.moods.find_one({"_id": result.inserted_id})
+    
+    return MoodEntryResponse(**created_mood)
+
+@router.get("", response_model=List[MoodEntryResponse])
+async def get_mood_entries(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Get mood entries for the current user, optionally filtered by date range."""
+    query = {"user_id": current_user.id}
+    
+    # Add date filters if provided
+    if start_date or end_date:
+        query["timestamp"] = {}
+        if start_date:
+            query["timestamp"]["$gte"] = start_date
+        if end_date:
+            query["timestamp"]["$lte"] = end_date
+    
+    moods = []
+    cursor = db.moods.find(query).sort("timestamp", -1)  # Newest first
+    
+    async for mood in cursor:
+        moods.append(MoodEntryResponse(**mood))
+    
+    return moods
+
+@router.get("/{mood_id}", response_model=MoodEntryResponse)
+async def get_mood_entry(
+    mood_id: str,
+    current_user: User = Depends(get_current_user),
+    db=Depends(get_db)
+):
+    """Get a specific mood entry."""
+    mood = await db.moods.find_one({"_id": ObjectId(mood_id), "user_id": current_user.id})
+    if not mood:
+        raise HTTPException(status_code=404, detail="Mood entry not found")
+    
+    return MoodEntryResponse(**mood)
@@ -0,0 +1,95 @@
+"""
+User and authentication routes for the Vyānamana API.
+"""
+from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.security import OAuth2PasswordRequestForm
+
+from config import ACCESS_TOKEN_EXPIRE_MINUTES
+from database import get_db
+from models.user import User, UserCreate, UserResponse
+from security import (
+    Token,
+    authenticate_user,
+    create_access_token,
+    get_current_user,
+    get_password_hash,
+)
+
+router = APIRouter(tags=["users"])
+
+
+@router.post("/token", response_model=Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db=Depends(get_db)
+):
+    """Login endpoint to get access token."""
+    user = await authenticate_user(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Update last login time
+    await db.users.update_one(
+        {"_id": user.id},
+        {"$set": {"last_login": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+    )
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/users", response_model=UserResponse)
+async def create_user(user_create: UserCreate, db=Depends(get_db)):
+    """Create a new user."""
+    # Check if email already exists
+    existing_user = await db.users.find_one({"email": user_create.email})
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Create new user with hashed password
+    hashed_password = get_password_hash(user_create.password)
+    user = User(
+        name=user_create.name,
+        email=user_create.email,
+        password_hash=hashed_password,
+        is_anonymous=False,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    
+    result = await db.users.insert_one(user.dict(by_alias=True))
+    created_user = await db.users.find_one({"_id": result.inserted_id})
+    
+    return UserResponse(**created_user)
+
+@router.post("/users/anonymous", response_model=UserResponse)
+async def create_anonymous_user(db=Depends(get_db)):
+    """Create an anonymous user."""
+    user = User(
+        name="Anonymous User",
+        email=f"anonymous-{datetime.utcnow().timestamp()}@vyanamana.app",
+        password_hash="",  # No password for anonymous users
+        is_anonymous=True,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    
+    result = await db.users.insert_one(user.dict(by_alias=True))
+    created_user = await db.users.find_one({"_id": result.inserted_id})
+    
+    return UserResponse(**created_user)
+
+@router.get("/users/me", response_model=UserResponse)
+async def get_current_user_info(current_user: User = Depends(get_current_user)):
+    """Get current authenticated user info."""
+    return UserResponse(**current_user.dict())
@@ -0,0 +1,109 @@
+"""
+Authentication helpers for the Vyānamana backend.
+"""
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from pydantic import BaseModel
+from starlette.requests import Request
+
+from config import ALGORITHM, SECRET_KEY
+from database import get_db
+from middleware.rate_limit import client_ip_key
+from models.user import User
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+# Authentication models
+class Token(BaseModel):
+    """Token schema for authentication."""
+    access_token: str
+    token_type: str
+
+class TokenData(BaseModel):
+    """Token data schema containing user ID."""
+    user_id: Optional[str] = None
+
+
+# Password hashing
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Create the passlib context on first use rather than at import time."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def verify_password(plain_password, hashed_password):
+    """Verify password against its hash."""
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def get_password_hash(password):
+    """Generate password hash."""
+    return get_pwd_context().hash(password)
+
+
+# Helper functions
+async def get_user(db, email: str):
+    """Get user by email."""
+    user = await db.users.find_one({"email": email})
+    if user:
+        return User(**user)
+
+async def authenticate_user(db, email: str, password: str):
+    """Authenticate user with email and password."""
+    user = await get_user(db, email)
+    if not user:
+        return False
+    if not verify_password(password, user.password_hash):
+        return False
+    return user
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    """Create JWT access token."""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=15)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    """Get current authenticated user from token."""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = payload.get("sub")
+        if user_id is None:
+            raise credentials_exception
+        token_data = TokenData(user_id=user_id)
+    except JWTError:
+        raise credentials_exception
+    
+    user = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
+    if user is None:
+        raise credentials_exception
+    return User(**user)
+
+def rate_limit_key(request: Request) -> str:
+    """Key requests by the token's user ID, falling back to client IP."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+        except JWTError:
+            user_id = None
+        if user_id:
+            return f"user:{user_id}"
+    return client_ip_key(request)
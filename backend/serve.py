@@ -0,0 +1,53 @@
+"""
+Production launcher for the Vyānamana backend.
+
+Each worker builds its own application through ``main:create_app``, so no
+database client or password context is shared across a fork. Apart from
+the worker count, the only change from uvicorn's defaults is turning off
+the per-request access log. uvicorn already picks uvloop and httptools
+when they are installed.
+"""
+import argparse
+import logging
+
+import uvicorn
+
+from config import HOST, PORT, RATE_LIMIT_BACKEND, WEB_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Run uvicorn with one application per worker process."""
+    parser = argparse.ArgumentParser(description="Run the Vyānamana API server.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--reload", action="store_true", help="Development mode: single worker with auto-reload")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s:     %(message)s")
+
+    if args.reload:
+        uvicorn.run("main:create_app", factory=True, host=args.host, port=args.port, reload=True)
+        return
+
+    if args.workers > 1 and RATE_LIMIT_BACKEND == "local":
+        logger.warning(
+            "RATE_LIMIT_BACKEND=local with %d workers: each worker keeps its own "
+            "buckets, so every rate limit is effectively %d times higher. "
+            "Set RATE_LIMIT_BACKEND=redis to share limits between workers.",
+            args.workers, args.workers,
+        )
+
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
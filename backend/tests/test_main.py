@@ -0,0 +1,74 @@
+"""
+Tests for the application factory and lazy initialization.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import database
+import main
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_has_no_heavy_side_effects():
+    probe = (
+        "import json, sys, main; "
+        "print(json.dumps({m: m in sys.modules for m in "
+        "('motor.motor_asyncio', 'passlib.context', 'routers.users', 'routers.chats', 'routers.moods')}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    assert json.loads(output) == {
+        "motor.motor_asyncio": False,
+        "passlib.context": False,
+        "routers.users": False,
+        "routers.chats": False,
+        "routers.moods": False,
+    }
+
+
+def test_module_app_is_built_once():
+    assert main.app is main.app
+
+
+def test_create_app_registers_routes():
+    routes = {
+        (route.path, method)
+        for route in main.create_app().routes
+        for method in getattr(route, "methods", ())
+    }
+    assert {
+        ("/token", "POST"),
+        ("/users", "POST"),
+        ("/users/anonymous", "POST"),
+        ("/users/me", "GET"),
+        ("/chats", "POST"),
+        ("/chats", "GET"),
+        ("/chats/{chat_id}", "GET"),
+        ("/chats/{chat_id}/messages", "POST"),
+        ("/moods", "POST"),
+        ("/moods", "GET"),
+        ("/moods/{mood_id}", "GET"),
+    } <= routes
+
+
+def test_close_client_without_client_is_a_no_op():
+    database.get_client.cache_clear()
+    database.close_client()
+    assert database.get_client.cache_info().currsize == 0
+
+
+def test_get_db_creates_one_client():
+    async def run():
+        return await asyncio.gather(*(database.get_db() for _ in range(20)))
+
+    try:
+        dbs = asyncio.run(run())
+        assert len({id(db.client) for db in dbs}) == 1
+    finally:
+        database.close_client()
+    assert database.get_client.cache_info().currsize == 0
@@ -0,0 +1,298 @@
+"""
+Tests for the rate limiting and load shedding middleware.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from middleware import rate_limit
+from middleware.rate_limit import (
+    EventLoopLagMonitor,
+    LocalBucketStore,
+    PoolWaitMonitor,
+    RateLimitMiddleware,
+    RateLimitRule,
+    RedisBucketStore,
+)
+
+
+class FakeClock:
+    """Manually advanced clock for LocalBucketStore."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubRedisError(Exception):
+    """Stands in for redis.exceptions.RedisError."""
+
+
+class StubRedis:
+    """Minimal Redis client whose script either fails or reports a full bucket."""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+        self.closed = False
+
+    def register_script(self, script):
+        async def run(keys, args):
+            self.calls += 1
+            if self.down:
+                raise StubRedisError("connection refused")
+            capacity, _, cost = args
+            return 1, str(capacity - cost)
+        return run
+
+    async def aclose(self):
+        self.closed = True
+
+
+def consume(store, key="k", capacity=3, refill_rate=1.0):
+    return asyncio.run(store.consume(key, capacity, refill_rate))
+
+
+def request(middleware, method="POST", path="/token", client="1.2.3.4"):
+    """Send one request through the middleware and return (status, headers)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": (client, 12345), "server": ("localhost", 8000),
+    }
+    result = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+            result["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+
+    asyncio.run(middleware(scope, receive, send))
+    return result["status"], result["headers"]
+
+
+def make_middleware(rules=None, **kwargs):
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    rules = rules or [RateLimitRule("POST", "/token", capacity=2, refill_rate=0.5)]
+    middleware = RateLimitMiddleware(app, rules=rules, **kwargs)
+    return middleware, calls
+
+
+def test_local_store_allows_burst_then_rejects():
+    store = LocalBucketStore(clock=FakeClock())
+    assert [consume(store)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_local_store_retry_after_and_refill():
+    clock = FakeClock()
+    store = LocalBucketStore(clock=clock)
+    for _ in range(3):
+        consume(store, refill_rate=0.5)
+    allowed, retry_after = consume(store, refill_rate=0.5)
+    assert not allowed
+    assert retry_after == 2.0
+
+    clock.now += 1.0
+    allowed, retry_after = consume(store, refill_rate=0.5)
+    assert not allowed
+    assert retry_after == 1.0
+
+    clock.now += 1.0
+    assert consume(store, refill_rate=0.5) == (True, 0.0)
+
+
+def test_local_store_keys_are_independent():
+    store = LocalBucketStore(clock=FakeClock())
+    for _ in range(3):
+        consume(store, key="a")
+    assert not consume(store, key="a")[0]
+    assert consume(store, key="b")[0]
+
+
+def test_local_store_prunes_idle_buckets():
+    clock = FakeClock()
+    store = LocalBucketStore(clock=clock, sweep_interval=60)
+    for i in range(1000):
+        consume(store, key=f"k{i}")
+    assert len(store) == 1000
+
+    clock.now += 1e6
+    consume(store, key="new")
+    assert len(store) == 1
+
+
+def test_rule_matches_path_templates():
+    rule = RateLimitRule("POST", "/chats/{chat_id}/messages", capacity=1, refill_rate=1)
+    assert rule.matches("POST", "/chats/abc123/messages")
+    assert not rule.matches("GET", "/chats/abc123/messages")
+    assert not rule.matches("POST", "/chats/abc123")
+    assert not rule.matches("POST", "/chats/a/b/messages")
+
+
+def test_rule_does_not_match_longer_paths():
+    rule = RateLimitRule("POST", "/users", capacity=1, refill_rate=1)
+    assert rule.matches("POST", "/users")
+    assert not rule.matches("POST", "/users/anonymous")
+
+
+def test_middleware_returns_429_with_retry_after():
+    middleware, calls = make_middleware(store=LocalBucketStore(clock=FakeClock()))
+    assert request(middleware)[0] == 200
+    assert request(middleware)[0] == 200
+    status, headers = request(middleware)
+    assert status == 429
+    assert headers["retry-after"] == "2"
+    assert len(calls) == 2
+
+
+def test_middleware_keys_by_client():
+    middleware, calls = make_middleware(store=LocalBucketStore(clock=FakeClock()))
+    for _ in range(2):
+        request(middleware, client="1.1.1.1")
+    assert request(middleware, client="1.1.1.1")[0] == 429
+    assert request(middleware, client="2.2.2.2")[0] == 200
+
+
+def test_middleware_sheds_on_loop_lag():
+    middleware, calls = make_middleware(lag_monitor=SimpleNamespace(lag=0.5), max_loop_lag=0.2)
+    status, headers = request(middleware)
+    assert status == 503
+    assert headers["retry-after"] == "1"
+    assert calls == []
+
+
+def test_middleware_sheds_on_pool_wait():
+    middleware, calls = make_middleware(pool_monitor=SimpleNamespace(wait=0.5), max_pool_wait=0.1)
+    assert request(middleware)[0] == 503
+    assert calls == []
+
+
+def test_middleware_passes_below_thresholds():
+    middleware, calls = make_middleware(
+        lag_monitor=SimpleNamespace(lag=0.01), max_loop_lag=0.2,
+        pool_monitor=SimpleNamespace(wait=0.01), max_pool_wait=0.1,
+    )
+    assert request(middleware)[0] == 200
+    assert calls == ["/token"]
+
+
+def test_middleware_ignores_unlimited_routes():
+    middleware, calls = make_middleware(
+        store=LocalBucketStore(clock=FakeClock()),
+        lag_monitor=SimpleNamespace(lag=10.0), max_loop_lag=0.2,
+    )
+    for _ in range(5):
+        assert request(middleware, method="GET", path="/moods")[0] == 200
+    assert request(middleware, method="GET", path="/token")[0] == 200
+    assert len(calls) == 6
+
+
+def make_redis_store(clock):
+    redis = StubRedis()
+    store = RedisBucketStore(redis, errors=StubRedisError, cooldown=5.0, clock=clock)
+    return store, redis
+
+
+def test_redis_store_uses_script_result():
+    store, redis = make_redis_store(FakeClock())
+    assert consume(store) == (True, 0.0)
+    assert redis.calls == 1
+
+
+def test_redis_store_falls_back_to_local_buckets():
+    store, redis = make_redis_store(FakeClock())
+    redis.down = True
+    assert [consume(store)[0] for _ in range(4)] == [True, True, True, False]
+
+
+def test_redis_store_skips_redis_during_cooldown():
+    clock = FakeClock()
+    store, redis = make_redis_store(clock)
+    redis.down = True
+    consume(store)
+    assert redis.calls == 1
+
+    clock.now += 4.0
+    for _ in range(3):
+        consume(store, key="other")
+    assert redis.calls == 1
+
+    clock.now += 1.0
+    consume(store, key="other")
+    assert redis.calls == 2
+
+    redis.down = False
+    clock.now += 5.0
+    consume(store, key="other")
+    consume(store, key="other")
+    assert redis.calls == 4
+
+
+def test_redis_store_close():
+    store, redis = make_redis_store(FakeClock())
+    asyncio.run(store.close())
+    assert redis.closed
+
+
+@pytest.fixture
+def monotonic(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    return clock
+
+
+def check_out(monitor, clock, duration, create=False):
+    monitor.connection_check_out_started(None)
+    if create:
+        monitor.connection_created(None)
+    clock.now += duration
+    monitor.connection_checked_out(None)
+
+
+def test_pool_monitor_records_check_out_wait(monotonic):
+    monitor = PoolWaitMonitor(smoothing=1.0)
+    check_out(monitor, monotonic, 0.3)
+    assert monitor.wait == pytest.approx(0.3)
+
+
+def test_pool_monitor_skips_new_connections(monotonic):
+    monitor = PoolWaitMonitor(smoothing=1.0)
+    check_out(monitor, monotonic, 0.01)
+    check_out(monitor, monotonic, 2.0, create=True)
+    assert monitor.wait == pytest.approx(0.01)
+
+    check_out(monitor, monotonic, 0.02)
+    assert monitor.wait == pytest.approx(0.02)
+
+
+def test_pool_monitor_wait_goes_stale(monotonic):
+    monitor = PoolWaitMonitor(smoothing=1.0, stale_after=5.0)
+    check_out(monitor, monotonic, 0.3)
+    monotonic.now += 5.1
+    assert monitor.wait == 0.0
+
+
+def test_lag_monitor_start_and_stop():
+    async def run():
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor, [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    monitor, pending = asyncio.run(run())
+    assert pending == []
+    assert monitor.lag == 0.0
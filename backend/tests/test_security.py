@@ -0,0 +1,31 @@
+"""
+Tests for the authentication helpers.
+"""
+from datetime import timedelta
+from types import SimpleNamespace
+
+from security import create_access_token, rate_limit_key
+
+
+def make_request(authorization=None, client="1.2.3.4"):
+    headers = {"authorization": authorization} if authorization else {}
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host=client))
+
+
+def test_rate_limit_key_uses_token_subject():
+    token = create_access_token({"sub": "60d5ec9af682dbd134b216a8"})
+    assert rate_limit_key(make_request(f"Bearer {token}")) == "user:60d5ec9af682dbd134b216a8"
+
+
+def test_rate_limit_key_falls_back_to_ip_for_invalid_token():
+    assert rate_limit_key(make_request("Bearer not-a-token")) == "ip:1.2.3.4"
+
+
+def test_rate_limit_key_falls_back_to_ip_for_expired_token():
+    token = create_access_token({"sub": "60d5ec9af682dbd134b216a8"}, expires_delta=timedelta(minutes=-1))
+    assert rate_limit_key(make_request(f"Bearer {token}")) == "ip:1.2.3.4"
+
+
+def test_rate_limit_key_without_token_uses_ip():
+    assert rate_limit_key(make_request()) == "ip:1.2.3.4"
+    assert rate_limit_key(make_request("Basic abc")) == "ip:1.2.3.4"